@@ -0,0 +1,89 @@
+"""Startup-time benchmark for the backend.
+
+Measures, in fresh interpreter processes, how long it takes to import the
+Flask app and to serve the first metadata-only request, and checks that no
+document parser was loaded along the way. Exits non-zero when a budget is
+exceeded so it can be run as a regression check:
+
+    cd backend
+    python benchmarks/startup.py --runs 5 --max-import 0.8 --max-first-request 1.0
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Parsers that must only be loaded when a file of that type is extracted
+LAZY_MODULES = ['PyPDF2', 'pdfplumber', 'pdfminer', 'PIL', 'docx', 'openpyxl']
+
+CHILD_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from src.main import app
+imported = time.perf_counter()
+response = app.test_client().get('/api/discover-locations')
+served = time.perf_counter()
+print(json.dumps({
+    'import': imported - start,
+    'first_request': served - start,
+    'status': response.status_code,
+    'loaded': [name for name in %r if name in sys.modules],
+}))
+""" % (LAZY_MODULES,)
+
+
+def run_once() -> dict:
+    """Time one cold start in a new interpreter"""
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD_SCRIPT],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result['process'] = time.perf_counter() - start
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='number of cold starts to time')
+    parser.add_argument('--max-import', type=float, default=None,
+                        help='fail if the median app import time exceeds this many seconds')
+    parser.add_argument('--max-first-request', type=float, default=1.0,
+                        help='fail if the median time to first request exceeds this many seconds')
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    medians = {
+        key: statistics.median(run[key] for run in runs)
+        for key in ('import', 'first_request', 'process')
+    }
+
+    print(f"app import:        {medians['import'] * 1000:8.1f} ms (median of {args.runs})")
+    print(f"first request:     {medians['first_request'] * 1000:8.1f} ms")
+    print(f"whole process:     {medians['process'] * 1000:8.1f} ms")
+
+    failures = []
+    if any(run['status'] != 200 for run in runs):
+        failures.append('/api/discover-locations did not return 200')
+    loaded = sorted({name for run in runs for name in run['loaded']})
+    if loaded:
+        failures.append(f"parsers loaded at startup: {', '.join(loaded)}")
+    if args.max_import is not None and medians['import'] > args.max_import:
+        failures.append(f"import took {medians['import']:.3f}s (budget {args.max_import}s)")
+    if args.max_first_request is not None and medians['first_request'] > args.max_first_request:
+        failures.append(f"first request took {medians['first_request']:.3f}s "
+                        f"(budget {args.max_first_request}s)")
+
+    for failure in failures:
+        print(f'FAIL: {failure}')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,10 +8,20 @@ from flask_cors import CORS
 from src.models.user import db
 from src.routes.user import user_bp
 from src.routes.search import search_bp
+from src.services.search_coordinator import SearchCoordinator
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
 
+# Peer backends for /api/search/cluster, e.g. SEARCH_PEERS=http://host-a:5010,http://host-b:5010
+app.config['SEARCH_PEERS'] = [peer.strip() for peer in os.environ.get('SEARCH_PEERS', '').split(',') if peer.strip()]
+app.config['SEARCH_PEER_TIMEOUT'] = float(os.environ.get('SEARCH_PEER_TIMEOUT', 30))
+# Built once here so a malformed peer URL fails at startup rather than per request
+if app.config['SEARCH_PEERS']:
+    app.extensions['search_coordinator'] = SearchCoordinator(
+        app.config['SEARCH_PEERS'], app.config['SEARCH_PEER_TIMEOUT']
+    )
+
 # Enable CORS for all routes
 CORS(app)
 
@@ -26,8 +36,7 @@ os.makedirs(db_dir, exist_ok=True)
 app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(db_dir, 'app.db')}"
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
-with app.app_context():
-    db.create_all()
+# Tables are created on first use of the user routes (see src/routes/user.py)
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
@@ -47,5 +56,5 @@ def serve(path):
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5010, debug=True)
+    app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 5010)), debug=True)
 
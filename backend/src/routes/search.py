@@ -1,6 +1,7 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_cors import cross_origin
 from src.services.file_discovery import FileDiscoveryService
+from src.services.query import SearchQuery, QuerySyntaxError
 import json
 
 search_bp = Blueprint('search', __name__)
@@ -40,6 +41,7 @@ def search_files():
         search_terms = data.get('terms', [])
         search_content = data.get('searchContent', True)
         deep_search = data.get('deepSearch', False)
+        query = data.get('query')
         
         if not search_paths:
             return jsonify({
@@ -47,17 +49,136 @@ def search_files():
                 'error': 'No search paths provided'
             }), 400
         
-        if not search_terms:
+        if not search_terms and not query:
             return jsonify({
                 'success': False,
                 'error': 'No search terms provided'
             }), 400
         
+        # Reject malformed terms here instead of failing per file
+        if not query:
+            SearchQuery.from_terms(search_terms)
+        
         # Perform the search with enhanced reporting
-        search_result = file_service.search_files(search_paths, search_terms, search_content, deep_search)
+        search_result = file_service.search_files(search_paths, search_terms, search_content, deep_search, query)
         
         return jsonify(search_result)
         
+    except QuerySyntaxError as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid query: {e}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@search_bp.route('/search/batch', methods=['POST'])
+@cross_origin()
+def search_files_batch():
+    """Run several searches over the same paths in a single pass"""
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({
+                'success': False,
+                'error': 'No data provided'
+            }), 400
+        
+        search_paths = data.get('paths', [])
+        queries = data.get('queries', [])
+        search_content = data.get('searchContent', True)
+        deep_search = data.get('deepSearch', False)
+        
+        if not search_paths:
+            return jsonify({
+                'success': False,
+                'error': 'No search paths provided'
+            }), 400
+        
+        if not queries:
+            return jsonify({
+                'success': False,
+                'error': 'No queries provided'
+            }), 400
+        
+        # Each entry takes the same "terms" or "query" fields as /search
+        parsed_queries = []
+        for index, entry in enumerate(queries):
+            try:
+                if not isinstance(entry, dict):
+                    raise QuerySyntaxError('expected an object with "terms" or "query"')
+                if entry.get('query'):
+                    parsed_queries.append(SearchQuery(entry['query']))
+                else:
+                    parsed_queries.append(SearchQuery.from_terms(entry.get('terms', [])))
+            except QuerySyntaxError as e:
+                return jsonify({
+                    'success': False,
+                    'error': f'Invalid query {index}: {e}'
+                }), 400
+        
+        search_result = file_service.search_files_batch(search_paths, parsed_queries, search_content, deep_search)
+        
+        return jsonify(search_result)
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@search_bp.route('/search/cluster', methods=['POST'])
+@cross_origin()
+def search_cluster():
+    """Coordinator mode: run a search on every configured peer and merge the results"""
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({
+                'success': False,
+                'error': 'No data provided'
+            }), 400
+        
+        search_coordinator = current_app.extensions.get('search_coordinator')
+        if search_coordinator is None:
+            return jsonify({
+                'success': False,
+                'error': 'No search peers configured (set SEARCH_PEERS)'
+            }), 400
+        
+        if not data.get('paths'):
+            return jsonify({
+                'success': False,
+                'error': 'No search paths provided'
+            }), 400
+        
+        if not data.get('terms') and not data.get('query'):
+            return jsonify({
+                'success': False,
+                'error': 'No search terms provided'
+            }), 400
+        
+        # Reject bad queries here rather than once per shard
+        if data.get('query'):
+            SearchQuery(data['query'])
+        else:
+            SearchQuery.from_terms(data['terms'])
+        
+        payload = {key: data[key] for key in ('paths', 'terms', 'query', 'searchContent', 'deepSearch') if key in data}
+        search_result = search_coordinator.search(payload)
+        
+        return jsonify(search_result), 200 if search_result['success'] else 502
+        
+    except QuerySyntaxError as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid query: {e}'
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
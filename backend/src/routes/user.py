@@ -1,7 +1,20 @@
+import threading
 from flask import Blueprint, jsonify, request
 from src.models.user import User, db
 
 user_bp = Blueprint('user', __name__)
+_tables_created = False
+_tables_lock = threading.Lock()
+
+@user_bp.before_request
+def create_tables():
+    """Create the user tables on first use instead of at app startup"""
+    global _tables_created
+    if not _tables_created:
+        with _tables_lock:
+            if not _tables_created:
+                db.create_all()
+                _tables_created = True
 
 @user_bp.route('/users', methods=['GET'])
 def get_users():
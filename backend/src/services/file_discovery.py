@@ -1,28 +1,41 @@
 import os
 import sys
+import hashlib
 import platform
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple, Callable
 import mimetypes
 import json
 from datetime import datetime
 
-# Document parsing imports
-import PyPDF2
-import pdfplumber
-from docx import Document
-import openpyxl
+# Document parsers (PyPDF2, pdfplumber, python-docx, openpyxl) are imported
+# by their extractors on first use to keep process startup cheap
 import csv
 
+from src.services.query import SearchQuery, QueryDocument
+
 class FileDiscoveryService:
     """Service for discovering and searching files across different storage locations"""
     
     def __init__(self):
-        self.supported_extensions = {
-            '.txt', '.md', '.rtf', '.pdf', '.docx', '.doc', '.odt',
-            '.xlsx', '.xls', '.csv', '.pptx', '.ppt', '.py', '.js',
-            '.html', '.css', '.json', '.xml', '.yaml', '.yml'
-        }
+        # Types searched by filename only; register_extractor adds the rest
+        self.supported_extensions = {'.rtf', '.doc', '.odt', '.pptx', '.ppt'}
+        
+        # Extension -> extractor(file_path, deep_search)
+        self.extractors = {}
+        self.register_extractor(['.txt', '.md'], self._read_text_file)
+        self.register_extractor(['.pdf'], self._extract_pdf_text)
+        self.register_extractor(['.docx'], self._extract_docx_text)
+        self.register_extractor(['.xlsx', '.xls'], self._extract_excel_text)
+        self.register_extractor(['.csv'], self._extract_csv_text)
+        self.register_extractor(['.py', '.js', '.html', '.css', '.json', '.xml', '.yaml', '.yml'],
+                                self._read_text_file)
+    
+    def register_extractor(self, extensions: List[str], extractor: Callable[[Path, bool], str]):
+        """Register a text extractor for one or more file extensions and mark them searchable"""
+        for extension in extensions:
+            self.extractors[extension.lower()] = extractor
+            self.supported_extensions.add(extension.lower())
         
     def discover_storage_locations(self) -> List[Dict[str, Any]]:
         """Discover accessible storage locations on the system"""
@@ -212,8 +225,14 @@ class FileDiscoveryService:
         return external_drives
     
     def search_files(self, search_paths: List[str], search_terms: List[str], 
-                    search_content: bool = True, deep_search: bool = False) -> Dict[str, Any]:
-        """Search for files containing specified terms with enhanced reporting"""
+                    search_content: bool = True, deep_search: bool = False,
+                    query: Optional[str] = None) -> Dict[str, Any]:
+        """Search for files containing specified terms with enhanced reporting
+
+        If ``query`` is given it is parsed with ``SearchQuery`` (raising
+        ``QuerySyntaxError`` on bad input) and used instead of ``search_terms``.
+        """
+        parsed_query = SearchQuery(query) if query else None
         results = []
         total_files_scanned = 0
         total_directories_scanned = 0
@@ -228,21 +247,88 @@ class FileDiscoveryService:
                 total_files_scanned += 1
                 
                 if file_path.suffix.lower() in self.supported_extensions:
-                    file_info = self._analyze_file(file_path, search_terms, search_content, deep_search)
-                    if file_info and file_info['matches']:
+                    if parsed_query:
+                        file_info = self._analyze_file_queries(file_path, [parsed_query], search_content, deep_search)[0][0]
+                    else:
+                        file_info = self._analyze_file(file_path, search_terms, search_content, deep_search)
+                    if file_info:
                         results.append(file_info)
                 else:
                     skipped_files += 1
         
+        stats = {
+            'total_files_scanned': total_files_scanned,
+            'total_directories_scanned': total_directories_scanned,
+            'matching_files': len(results),
+            'skipped_files': skipped_files,
+            'search_terms': parsed_query.term_labels if parsed_query else search_terms,
+            'deep_search_enabled': deep_search
+        }
+        if parsed_query:
+            stats['query'] = query
+        
         return {
             'success': True,
             'results': results,
-            'stats': {
+            'stats': stats
+        }
+    
+    def search_files_batch(self, search_paths: List[str], queries: List[SearchQuery],
+                           search_content: bool = True, deep_search: bool = False) -> Dict[str, Any]:
+        """Run several queries over the same paths with a single walk and extraction pass
+
+        Each file is stat'ed and extracted at most once and every query is
+        evaluated against that shared copy, so N queries cost about as much as one.
+        """
+        results = [[] for _ in queries]
+        total_files_scanned = 0
+        total_directories_scanned = 0
+        skipped_files = 0
+        files_extracted = 0
+        
+        for search_path in search_paths:
+            path = Path(search_path)
+            if not path.exists():
+                continue
+                
+            for file_path in self._walk_directory(path):
+                total_files_scanned += 1
+                
+                if file_path.suffix.lower() in self.supported_extensions:
+                    file_infos, extracted = self._analyze_file_queries(file_path, queries, search_content, deep_search)
+                    if extracted:
+                        files_extracted += 1
+                    for query_results, file_info in zip(results, file_infos):
+                        if file_info:
+                            query_results.append(file_info)
+                else:
+                    skipped_files += 1
+        
+        query_results = []
+        for query, matches in zip(queries, results):
+            stats = {
                 'total_files_scanned': total_files_scanned,
                 'total_directories_scanned': total_directories_scanned,
-                'matching_files': len(results),
+                'matching_files': len(matches),
+                'skipped_files': skipped_files,
+                'search_terms': query.term_labels,
+                'deep_search_enabled': deep_search
+            }
+            if query.query:
+                stats['query'] = query.query
+            query_results.append({
+                'results': matches,
+                'stats': stats
+            })
+        
+        return {
+            'success': True,
+            'queries': query_results,
+            'stats': {
+                'total_queries': len(queries),
+                'total_files_scanned': total_files_scanned,
+                'files_extracted': files_extracted,
                 'skipped_files': skipped_files,
-                'search_terms': search_terms,
                 'deep_search_enabled': deep_search
             }
         }
@@ -290,9 +376,74 @@ class FileDiscoveryService:
                         if term.lower() in content_lower and term not in file_info['matches']:
                             file_info['matches'].append(term)
             
-            return file_info if file_info['matches'] else None
+            if not file_info['matches']:
+                return None
+            file_info['content_hash'] = self._hash_file(file_path)
+            return file_info
+            
+        except (PermissionError, OSError, Exception):
+            return None
+    
+    def _analyze_file_queries(self, file_path: Path, queries: List[SearchQuery],
+                             search_content: bool, deep_search: bool = False) -> Tuple[List[Optional[Dict[str, Any]]], bool]:
+        """Evaluate parsed queries against a file, extracting content at most once
+
+        Returns one file info dict (or ``None``) per query, in query order,
+        and whether the file's content was extracted.
+        """
+        file_infos = [None] * len(queries)
+        extracted = False
+        try:
+            stat = file_path.stat()
+            doc = QueryDocument(
+                name=file_path.name,
+                extension=file_path.suffix.lower(),
+                size=stat.st_size,
+                mtime=stat.st_mtime
+            )
+            
+            # Metadata and filename predicates first; only extract if some query is still undecided
+            candidates = [i for i, query in enumerate(queries) if query.evaluate(doc) is not False]
+            if not candidates:
+                return file_infos, extracted
+            
+            content = ''
+            if search_content or deep_search:
+                content = self._extract_text_content(file_path, deep_search)
+                extracted = True
+            doc = QueryDocument(doc.name, doc.extension, doc.size, doc.mtime, content)
+            
+            base_info = None
+            for i in candidates:
+                if not queries[i].evaluate(doc):
+                    continue
+                if base_info is None:
+                    base_info = {
+                        'path': str(file_path),
+                        'name': file_path.name,
+                        'size': stat.st_size,
+                        'modified': datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                        'type': self._get_file_type(file_path),
+                        'content_preview': content[:500] + '...' if len(content) > 500 else content,
+                        'full_content': content,
+                        'content_hash': self._hash_file(file_path)
+                    }
+                file_infos[i] = dict(base_info, matches=queries[i].matched_terms(doc))
             
         except (PermissionError, OSError, Exception):
+            pass
+        
+        return file_infos, extracted
+    
+    def _hash_file(self, file_path: Path, chunk_size: int = 1024 * 1024) -> Optional[str]:
+        """SHA-256 of the file's bytes, used to recognise copies across nodes"""
+        try:
+            digest = hashlib.sha256()
+            with open(file_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(chunk_size), b''):
+                    digest.update(chunk)
+            return digest.hexdigest()
+        except (PermissionError, OSError):
             return None
     
     def _get_file_type(self, file_path: Path) -> str:
@@ -318,27 +469,16 @@ class FileDiscoveryService:
     def _extract_text_content(self, file_path: Path, deep_search: bool = False) -> str:
         """Extract text content from various file types with optional deep search"""
         try:
-            extension = file_path.suffix.lower()
-            
-            if extension == '.txt' or extension == '.md':
-                return self._read_text_file(file_path)
-            elif extension == '.pdf':
-                return self._extract_pdf_text(file_path, deep_search)
-            elif extension == '.docx':
-                return self._extract_docx_text(file_path, deep_search)
-            elif extension in ['.xlsx', '.xls']:
-                return self._extract_excel_text(file_path, deep_search)
-            elif extension == '.csv':
-                return self._extract_csv_text(file_path)
-            elif extension in ['.py', '.js', '.html', '.css', '.json', '.xml', '.yaml', '.yml']:
-                return self._read_text_file(file_path)
+            extractor = self.extractors.get(file_path.suffix.lower())
+            if extractor:
+                return extractor(file_path, deep_search)
             
         except Exception:
             pass
         
         return ''
     
-    def _read_text_file(self, file_path: Path) -> str:
+    def _read_text_file(self, file_path: Path, deep_search: bool = False) -> str:
         """Read plain text file with encoding detection"""
         encodings = ['utf-8', 'utf-16', 'latin-1', 'cp1252']
         
@@ -354,6 +494,7 @@ class FileDiscoveryService:
     def _extract_pdf_text(self, file_path: Path, deep_search: bool = False) -> str:
         """Extract text from PDF using pdfplumber with optional deep extraction"""
         try:
+            import pdfplumber
             with pdfplumber.open(file_path) as pdf:
                 text = ''
                 max_pages = len(pdf.pages) if deep_search else min(10, len(pdf.pages))
@@ -371,6 +512,7 @@ class FileDiscoveryService:
         except Exception:
             # Fallback to PyPDF2
             try:
+                import PyPDF2
                 with open(file_path, 'rb') as f:
                     reader = PyPDF2.PdfReader(f)
                     text = ''
@@ -388,6 +530,7 @@ class FileDiscoveryService:
     def _extract_docx_text(self, file_path: Path, deep_search: bool = False) -> str:
         """Extract text from Word document with optional deep extraction"""
         try:
+            from docx import Document
             doc = Document(file_path)
             text = ''
             
@@ -420,6 +563,7 @@ class FileDiscoveryService:
     def _extract_excel_text(self, file_path: Path, deep_search: bool = False) -> str:
         """Extract text from Excel file with optional deep extraction"""
         try:
+            import openpyxl
             workbook = openpyxl.load_workbook(file_path, data_only=True)
             text = ''
             
@@ -441,7 +585,7 @@ class FileDiscoveryService:
         except Exception:
             return ''
     
-    def _extract_csv_text(self, file_path: Path) -> str:
+    def _extract_csv_text(self, file_path: Path, deep_search: bool = False) -> str:
         """Extract text from CSV file"""
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
@@ -0,0 +1,495 @@
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+
+class QuerySyntaxError(ValueError):
+    """Raised when a search query cannot be parsed"""
+
+
+@dataclass
+class QueryDocument:
+    """The parts of a file a query can be evaluated against.
+
+    ``content`` is ``None`` until the file has been extracted; text predicates
+    that cannot be decided from the filename alone then evaluate to ``None``.
+    """
+    name: str
+    extension: str
+    size: int
+    mtime: float
+    content: Optional[str] = None
+
+    def __post_init__(self):
+        self.name_lower = self.name.lower()
+        self.content_lower = self.content.lower() if self.content is not None else None
+
+
+# Three-valued logic helpers: True, False or None (not decidable yet)
+
+def _and(values) -> Optional[bool]:
+    result = True
+    for value in values:
+        if value is False:
+            return False
+        if value is None:
+            result = None
+    return result
+
+
+def _or(values) -> Optional[bool]:
+    result = False
+    for value in values:
+        if value is True:
+            return True
+        if value is None:
+            result = None
+    return result
+
+
+class Node:
+    """Base class for query AST nodes"""
+
+    def evaluate(self, doc: QueryDocument) -> Optional[bool]:
+        raise NotImplementedError
+
+    def positive_terms(self) -> List['Node']:
+        """Text predicates whose presence counts as a match (i.e. not under NOT)"""
+        return []
+
+
+class AndNode(Node):
+    def __init__(self, children: List[Node]):
+        self.children = children
+
+    def evaluate(self, doc):
+        return _and(child.evaluate(doc) for child in self.children)
+
+    def positive_terms(self):
+        return [term for child in self.children for term in child.positive_terms()]
+
+
+class OrNode(AndNode):
+    def evaluate(self, doc):
+        return _or(child.evaluate(doc) for child in self.children)
+
+
+class NotNode(Node):
+    def __init__(self, child: Node):
+        self.child = child
+
+    def evaluate(self, doc):
+        value = self.child.evaluate(doc)
+        return None if value is None else not value
+
+
+class TextNode(Node):
+    """Case-insensitive substring match against the filename or content"""
+
+    def __init__(self, text: str, phrase: bool = False):
+        self.text = text
+        self.needle = text.lower()
+        self.label = f'"{text}"' if phrase else text
+
+    def evaluate(self, doc):
+        if self.needle in doc.name_lower:
+            return True
+        if doc.content_lower is None:
+            return None
+        return self.needle in doc.content_lower
+
+    def positive_terms(self):
+        return [self]
+
+
+class RegexNode(Node):
+    """Regular expression match against the filename or content.
+
+    Literals the pattern cannot match without are checked with a plain
+    substring test first, so the regex engine only runs on candidate text.
+    """
+
+    def __init__(self, pattern: str, flags: str = ''):
+        re_flags = 0
+        for flag in flags:
+            if flag == 'i':
+                re_flags |= re.IGNORECASE
+            elif flag == 'm':
+                re_flags |= re.MULTILINE
+            elif flag == 's':
+                re_flags |= re.DOTALL
+            else:
+                raise QuerySyntaxError(f'Unknown regex flag "{flag}" in /{pattern}/{flags}')
+        try:
+            self.regex = re.compile(pattern, re_flags)
+        except re.error as e:
+            raise QuerySyntaxError(f'Invalid regex /{pattern}/: {e}')
+        self.ignore_case = bool(self.regex.flags & re.IGNORECASE)
+        self.literals = required_literals(pattern)
+        if self.ignore_case:
+            # str.lower() only agrees with re.IGNORECASE on ASCII (e.g. "ſ" matches "s"),
+            # so under ignore-case only ASCII literals are prefiltered, against ASCII text
+            self.literals = [literal.lower() for literal in self.literals if literal.isascii()]
+        self.label = f'/{pattern}/{flags}'
+
+    def _matches(self, text: str, text_lower: str) -> bool:
+        if self.ignore_case:
+            haystack = text_lower if text.isascii() else None
+        else:
+            haystack = text
+        if haystack is not None and not all(literal in haystack for literal in self.literals):
+            return False
+        return self.regex.search(text) is not None
+
+    def evaluate(self, doc):
+        if self._matches(doc.name, doc.name_lower):
+            return True
+        if doc.content is None:
+            return None
+        return self._matches(doc.content, doc.content_lower)
+
+    def positive_terms(self):
+        return [self]
+
+
+class ExtNode(Node):
+    def __init__(self, value: str):
+        self.extensions = {
+            '.' + ext.strip().lstrip('.').lower() for ext in value.split(',') if ext.strip()
+        }
+        if not self.extensions:
+            raise QuerySyntaxError('ext: requires at least one extension')
+
+    def evaluate(self, doc):
+        return doc.extension in self.extensions
+
+
+class RangeNode(Node):
+    """Inclusive/exclusive bounds check on a numeric stat attribute"""
+    attribute = ''
+
+    def __init__(self, low: Optional[float], high: Optional[float],
+                 low_inclusive: bool = True, high_inclusive: bool = True):
+        self.low = low
+        self.high = high
+        self.low_inclusive = low_inclusive
+        self.high_inclusive = high_inclusive
+
+    def evaluate(self, doc):
+        value = getattr(doc, self.attribute)
+        if self.low is not None:
+            if value < self.low or (value == self.low and not self.low_inclusive):
+                return False
+        if self.high is not None:
+            if value > self.high or (value == self.high and not self.high_inclusive):
+                return False
+        return True
+
+
+class SizeNode(RangeNode):
+    attribute = 'size'
+
+
+class ModifiedNode(RangeNode):
+    attribute = 'mtime'
+
+
+_CLASS_ESCAPES = set('dDwWsSbBAZ')
+
+
+def required_literals(pattern: str) -> List[str]:
+    """Return substrings every match of ``pattern`` must contain.
+
+    This is deliberately conservative: top-level alternation, verbose mode or
+    any alphanumeric escape other than a simple class escape (``\\d``, ``\\b``,
+    ...) yields no literals, and anything inside groups or classes is ignored.
+    """
+    if re.match(r'\(\?[a-zA-Z]*x', pattern):
+        return []
+    # Escapes such as \x41, \0101, \10, \g<1> or \N{...} span more than two
+    # characters and would otherwise leak into the literals
+    for escape in re.finditer(r'\\(.)', pattern, re.DOTALL):
+        if escape.group(1).isalnum() and escape.group(1) not in _CLASS_ESCAPES:
+            return []
+    literals = []
+    current = ''
+    depth = 0
+    i = 0
+
+    def flush():
+        nonlocal current
+        if current:
+            literals.append(current)
+        current = ''
+
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\' and i + 1 < len(pattern):
+            escaped = pattern[i + 1]
+            i += 2
+            if depth == 0 and not escaped.isalnum():
+                literal = escaped
+            else:
+                flush()
+                continue
+        elif char == '[':
+            # Skip the whole character class
+            flush()
+            i += 1
+            if i < len(pattern) and pattern[i] == '^':
+                i += 1
+            if i < len(pattern) and pattern[i] == ']':
+                i += 1
+            while i < len(pattern) and pattern[i] != ']':
+                i += 2 if pattern[i] == '\\' else 1
+            i += 1
+            continue
+        elif char == '(':
+            flush()
+            depth += 1
+            i += 1
+            continue
+        elif char == ')':
+            flush()
+            depth -= 1
+            i += 1
+            continue
+        elif char == '|':
+            if depth == 0:
+                return []
+            i += 1
+            continue
+        elif char == '{':
+            flush()
+            close = pattern.find('}', i)
+            i = close + 1 if close != -1 else i + 1
+            continue
+        elif char in '?*+':
+            flush()
+            i += 1
+            continue
+        elif char in '.^$':
+            flush()
+            i += 1
+            continue
+        else:
+            literal = char
+            i += 1
+
+        if depth > 0:
+            continue
+        if i < len(pattern) and pattern[i] in '?*{':
+            # The preceding character is optional
+            flush()
+            continue
+        current += literal
+        if i < len(pattern) and pattern[i] == '+':
+            flush()
+    flush()
+    return literals
+
+
+_SIZE_UNITS = {'': 1, 'b': 1, 'k': 1024, 'kb': 1024, 'm': 1024 ** 2, 'mb': 1024 ** 2,
+               'g': 1024 ** 3, 'gb': 1024 ** 3}
+_RELATIVE_UNITS = {'h': 'hours', 'd': 'days', 'w': 'weeks'}
+_COMPARISON = re.compile(r'^(>=|<=|>|<|=)?(.+)$')
+
+
+def _parse_size(value: str) -> int:
+    match = re.match(r'^(\d+(?:\.\d+)?)\s*([a-zA-Z]*)$', value)
+    if not match or match.group(2).lower() not in _SIZE_UNITS:
+        raise QuerySyntaxError(f'Invalid size "{value}"')
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).lower()])
+
+
+def _parse_time(value: str) -> Tuple[float, float]:
+    """Return the [start, end) timestamp span described by ``value``"""
+    relative = re.match(r'^(\d+)([hdw])$', value.lower())
+    try:
+        if relative:
+            delta = timedelta(**{_RELATIVE_UNITS[relative.group(2)]: int(relative.group(1))})
+            point = (datetime.now() - delta).timestamp()
+            return point, point
+        start = datetime.fromisoformat(value)
+        if len(value) == 10:
+            # A bare date covers the whole day
+            return start.timestamp(), (start + timedelta(days=1)).timestamp()
+        return start.timestamp(), start.timestamp()
+    except (OverflowError, ValueError, OSError):
+        raise QuerySyntaxError(f'Invalid date "{value}"')
+
+
+def _range_node(cls, value: str, parse) -> RangeNode:
+    """Build a range node from ``a..b``, ``>x``, ``<=x`` or a bare value"""
+    if '..' in value:
+        low, high = value.split('..', 1)
+        return cls(parse(low)[0] if low else None, parse(high)[1] if high else None,
+                   True, False if cls is ModifiedNode else True)
+    op, operand = _COMPARISON.match(value).groups()
+    start, end = parse(operand)
+    if op == '>':
+        return cls(end, None, low_inclusive=start != end)
+    if op == '>=':
+        return cls(start, None)
+    if op == '<':
+        return cls(None, start, high_inclusive=False)
+    if op == '<=':
+        return cls(None, end, high_inclusive=start == end)
+    if cls is ModifiedNode and start == end and re.match(r'^\d+[hdw]$', operand.lower()):
+        # "modified:7d" means "within the last 7 days"
+        return cls(start, None)
+    return cls(start, end, True, start == end)
+
+
+def _size_span(value: str) -> Tuple[float, float]:
+    size = _parse_size(value)
+    return size, size
+
+
+_FIELDS = {
+    'ext': lambda value: ExtNode(value),
+    'size': lambda value: _range_node(SizeNode, value, _size_span),
+    'modified': lambda value: _range_node(ModifiedNode, value, _parse_time),
+}
+
+_TOKEN = re.compile(r'''
+    \s*(?:
+        (?P<lparen>\()
+      | (?P<rparen>\))
+      | "(?P<phrase>(?:[^"\\]|\\.)*)"
+      | /(?P<regex>(?:[^/\\]|\\.)+)/(?P<flags>[a-zA-Z]*)
+      | (?P<word>[^\s()"]+)
+    )''', re.VERBOSE)
+
+
+def _tokenize(query: str) -> List[Tuple[str, str, str]]:
+    tokens = []
+    pos = 0
+    query = query.rstrip()
+    while pos < len(query):
+        match = _TOKEN.match(query, pos)
+        if not match:
+            raise QuerySyntaxError(f'Unexpected input at position {pos}: {query[pos:pos + 20]!r}')
+        pos = match.end()
+        kind = match.lastgroup if match.lastgroup != 'flags' else 'regex'
+        if kind == 'phrase':
+            tokens.append(('phrase', re.sub(r'\\(.)', r'\1', match.group('phrase')), ''))
+        elif kind == 'regex':
+            tokens.append(('regex', match.group('regex').replace('\\/', '/'), match.group('flags')))
+        elif kind == 'word' and match.group('word') in ('AND', 'OR', 'NOT'):
+            tokens.append((match.group('word'), '', ''))
+        else:
+            tokens.append((kind, match.group(kind) or '', ''))
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser; adjacent terms are implicitly ANDed"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def take(self):
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def parse(self) -> Node:
+        if not self.tokens:
+            raise QuerySyntaxError('Empty query')
+        node = self.parse_or()
+        if self.pos < len(self.tokens):
+            raise QuerySyntaxError('Unbalanced ")" in query')
+        return node
+
+    def parse_or(self) -> Node:
+        children = [self.parse_and()]
+        while self.peek() == 'OR':
+            self.take()
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else OrNode(children)
+
+    def parse_and(self) -> Node:
+        children = [self.parse_not()]
+        while self.peek() not in (None, 'OR', 'rparen'):
+            if self.peek() == 'AND':
+                self.take()
+            children.append(self.parse_not())
+        return children[0] if len(children) == 1 else AndNode(children)
+
+    def parse_not(self) -> Node:
+        if self.peek() == 'NOT':
+            self.take()
+            return NotNode(self.parse_not())
+        return self.parse_atom()
+
+    def parse_atom(self) -> Node:
+        kind = self.peek()
+        if kind is None:
+            raise QuerySyntaxError('Query ends unexpectedly')
+        kind, value, flags = self.take()
+        if kind == 'lparen':
+            node = self.parse_or()
+            if self.peek() != 'rparen':
+                raise QuerySyntaxError('Missing ")" in query')
+            self.take()
+            return node
+        if kind == 'phrase':
+            return TextNode(value, phrase=True)
+        if kind == 'regex':
+            return RegexNode(value, flags)
+        if kind == 'word':
+            field, sep, field_value = value.partition(':')
+            if sep and field.lower() in _FIELDS:
+                if not field_value:
+                    raise QuerySyntaxError(f'{field}: requires a value')
+                return _FIELDS[field.lower()](field_value)
+            return TextNode(value)
+        raise QuerySyntaxError(f'Unexpected "{kind}" in query')
+
+
+class SearchQuery:
+    """A parsed search query.
+
+    Supports ``AND``/``OR``/``NOT``, parentheses, ``"quoted phrases"``,
+    ``/regex/flags`` and the metadata fields ``ext:pdf,docx``,
+    ``size:>10kb`` (or ``size:1m..5m``) and ``modified:>2025-01-01``
+    (or relative, e.g. ``modified:7d`` for the last seven days).
+    """
+
+    def __init__(self, query: str):
+        if not isinstance(query, str):
+            raise QuerySyntaxError('Query must be a string')
+        self.query = query
+        self.root = _Parser(_tokenize(query)).parse()
+        self.terms = self.root.positive_terms()
+
+    @classmethod
+    def from_terms(cls, terms: List[str]) -> 'SearchQuery':
+        """Build the query equivalent to a plain term list (any term matches)"""
+        if not isinstance(terms, list) or not all(isinstance(term, str) for term in terms):
+            raise QuerySyntaxError('Terms must be a list of strings')
+        nodes = [TextNode(term) for term in terms if term]
+        if not nodes:
+            raise QuerySyntaxError('No search terms provided')
+        query = cls.__new__(cls)
+        query.query = None
+        query.root = nodes[0] if len(nodes) == 1 else OrNode(nodes)
+        query.terms = nodes
+        return query
+
+    def evaluate(self, doc: QueryDocument) -> Optional[bool]:
+        return self.root.evaluate(doc)
+
+    def matched_terms(self, doc: QueryDocument) -> List[str]:
+        """Labels of the positive text predicates that match ``doc``"""
+        return [term.label for term in self.terms if term.evaluate(doc)]
+
+    @property
+    def term_labels(self) -> List[str]:
+        return [term.label for term in self.terms]
@@ -0,0 +1,196 @@
+import http.client
+import json
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlsplit
+
+
+class PeerConnectionPool:
+    """Keep-alive HTTP connections to a single peer backend"""
+
+    def __init__(self, base_url: str, timeout: float, max_idle: int = 4):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f'Invalid peer URL: {base_url}')
+        self.base_url = base_url.rstrip('/')
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self.idle = queue.LifoQueue(maxsize=max_idle)
+
+    def _acquire(self, timeout: float):
+        try:
+            connection, reused = self.idle.get_nowait(), True
+        except queue.Empty:
+            connection, reused = self.connection_class(self.host, self.port), False
+        connection.timeout = timeout
+        if connection.sock is not None:
+            connection.sock.settimeout(timeout)
+        return connection, reused
+
+    def _release(self, connection):
+        try:
+            self.idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def post_json(self, path: str, payload: Dict[str, Any], deadline: Optional[float] = None):
+        """POST ``payload`` and return ``(status, decoded JSON body)``
+
+        Socket operations never wait past ``deadline`` (a ``time.monotonic()`` value).
+        """
+        body = json.dumps(payload).encode('utf-8')
+        headers = {'Content-Type': 'application/json', 'Connection': 'keep-alive'}
+        while True:
+            timeout = self.timeout
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.monotonic())
+                if timeout <= 0:
+                    raise TimeoutError('Deadline passed before the request was sent')
+            connection, reused = self._acquire(timeout)
+            try:
+                connection.request('POST', self.prefix + path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                connection.close()
+                if reused:
+                    # The peer closed an idle pooled connection; retry on a fresh one
+                    continue
+                raise
+            except Exception:
+                connection.close()
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(connection)
+            return response.status, json.loads(data.decode('utf-8'))
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class SearchCoordinator:
+    """Fan a search out to peer backends and merge their results
+
+    Each peer runs its own local ``/api/search``; results are merged as shards
+    answer, deduplicated by content hash, and shards that fail or miss the
+    timeout are reported in the stats rather than failing the whole search.
+    """
+
+    def __init__(self, peers: List[str], timeout: float = 30.0):
+        self.peers = [PeerConnectionPool(peer, timeout) for peer in peers]
+        self.timeout = timeout
+
+    def _query_shard(self, peer: PeerConnectionPool, payload: Dict[str, Any],
+                     deadlines: Dict[PeerConnectionPool, float]) -> Dict[str, Any]:
+        # The shard's clock starts when it is actually sent, not when it was queued
+        start = time.perf_counter()
+        deadline = deadlines[peer] = time.monotonic() + self.timeout
+        status, data = peer.post_json('/api/search', payload, deadline)
+        if status != 200 or not data.get('success'):
+            raise RuntimeError(data.get('error') or f'HTTP {status}')
+        data['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        return data
+
+    def _result_key(self, node: str, result: Dict[str, Any]):
+        # Peers hash the file bytes; a result without a hash is never merged
+        return result.get('content_hash') or (node, result.get('path'))
+
+    def search(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send one ``/api/search`` payload to every peer and merge the responses"""
+        # A per-search executor with one worker per peer, so concurrent searches
+        # never queue behind each other or behind a hung peer
+        executor = ThreadPoolExecutor(max_workers=max(1, len(self.peers)),
+                                      thread_name_prefix='search-shard')
+        deadlines = {}
+        futures = {
+            executor.submit(self._query_shard, peer, payload, deadlines): peer
+            for peer in self.peers
+        }
+        # Fallback for shards whose worker has not recorded its own deadline yet
+        deadline = time.monotonic() + self.timeout
+
+        results = []
+        seen = {}
+        shards = []
+        totals = {'total_files_scanned': 0, 'total_directories_scanned': 0, 'skipped_files': 0}
+        search_terms = payload.get('terms', [])
+        duplicates_removed = 0
+
+        pending = set(futures)
+        while pending:
+            shard_deadlines = [deadlines.get(futures[future], deadline) for future in pending]
+            remaining = max(shard_deadlines) - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = futures[future].base_url
+                try:
+                    data = future.result()
+                except Exception as e:
+                    shards.append({'node': node, 'success': False, 'error': str(e)})
+                    continue
+
+                stats = data.get('stats', {})
+                for key in totals:
+                    totals[key] += stats.get(key, 0)
+                search_terms = stats.get('search_terms', search_terms)
+                shards.append({
+                    'node': node,
+                    'success': True,
+                    'matching_files': len(data.get('results', [])),
+                    'elapsed_ms': data['elapsed_ms']
+                })
+
+                for result in data.get('results', []):
+                    key = self._result_key(node, result)
+                    if key in seen:
+                        seen[key].setdefault('duplicates', []).append({'node': node, 'path': result.get('path')})
+                        duplicates_removed += 1
+                        continue
+                    result['node'] = node
+                    seen[key] = result
+                    results.append(result)
+
+        # Socket timeouts are clamped to each shard's deadline, so abandoned workers exit promptly
+        executor.shutdown(wait=False, cancel_futures=True)
+        for future in pending:
+            shards.append({'node': futures[future].base_url, 'success': False,
+                           'error': f'Timed out after {self.timeout}s'})
+
+        shards_succeeded = sum(1 for shard in shards if shard['success'])
+        stats = dict(totals)
+        stats.update({
+            'matching_files': len(results),
+            'search_terms': search_terms,
+            'deep_search_enabled': payload.get('deepSearch', False),
+            'duplicates_removed': duplicates_removed,
+            'shards_total': len(self.peers),
+            'shards_succeeded': shards_succeeded,
+            'shards_failed': len(self.peers) - shards_succeeded,
+            'shards': shards
+        })
+        if payload.get('query'):
+            stats['query'] = payload['query']
+
+        return {
+            'success': shards_succeeded > 0,
+            'partial': 0 < shards_succeeded < len(self.peers),
+            'results': results,
+            'stats': stats
+        }
+
+    def close(self):
+        for peer in self.peers:
+            peer.close()
@@ -0,0 +1,39 @@
+import hashlib
+
+from src.services.file_discovery import FileDiscoveryService
+from src.services.query import SearchQuery
+
+
+def test_batch_matches_separate_searches(tmp_path):
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'budget.txt').write_text('quarterly numbers')
+    (tmp_path / 'sub' / 'notes.md').write_text('draft budget')
+    (tmp_path / 'report.py').write_text('print(1)')
+    service = FileDiscoveryService()
+    # Overlapping paths are scanned as given, exactly like /api/search
+    paths = [str(tmp_path), str(tmp_path / 'sub')]
+    queries = ['budget', 'ext:py', 'budget NOT draft']
+
+    batch = service.search_files_batch(paths, [SearchQuery(query) for query in queries])
+
+    for query, batch_result in zip(queries, batch['queries']):
+        single = service.search_files(paths, [], query=query)
+        assert batch_result['results'] == single['results']
+        assert batch_result['stats'] == single['stats']
+
+
+def test_register_extractor_makes_extension_searchable(tmp_path):
+    (tmp_path / 'notes.log').write_text('budget overrun')
+    service = FileDiscoveryService()
+    assert service.search_files([str(tmp_path)], ['budget'])['results'] == []
+
+    service.register_extractor(['.LOG'], service._read_text_file)
+
+    result = service.search_files([str(tmp_path)], ['budget'])
+    assert [file['name'] for file in result['results']] == ['notes.log']
+
+
+def test_results_carry_hash_of_file_bytes(tmp_path):
+    (tmp_path / 'budget.txt').write_bytes(b'quarterly budget')
+    result = FileDiscoveryService().search_files([str(tmp_path)], ['budget'])['results'][0]
+    assert result['content_hash'] == hashlib.sha256(b'quarterly budget').hexdigest()
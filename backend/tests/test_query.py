@@ -0,0 +1,112 @@
+import re
+import time
+
+import pytest
+
+from src.services.query import (
+    QueryDocument, QuerySyntaxError, RegexNode, SearchQuery, required_literals
+)
+
+
+def doc(name='notes.txt', content=None, size=100, mtime=None):
+    extension = '.' + name.rsplit('.', 1)[-1] if '.' in name else ''
+    return QueryDocument(name, extension, size, time.time() if mtime is None else mtime, content)
+
+
+@pytest.mark.parametrize('query', [
+    '', '(budget', 'budget)', 'NOT', 'budget AND', '/[/', '/abc/q',
+    'size:abc', 'ext:', 'modified:yesterday', 'modified:99999999d', 'modified:>9999999w',
+])
+def test_invalid_queries_raise_syntax_error(query):
+    with pytest.raises(QuerySyntaxError):
+        SearchQuery(query)
+
+
+@pytest.mark.parametrize('query', [123, None, ['budget'], {'q': 'budget'}])
+def test_non_string_query_raises_syntax_error(query):
+    with pytest.raises(QuerySyntaxError):
+        SearchQuery(query)
+
+
+@pytest.mark.parametrize('terms', ['budget', [1], ['budget', None], []])
+def test_invalid_terms_raise_syntax_error(terms):
+    with pytest.raises(QuerySyntaxError):
+        SearchQuery.from_terms(terms)
+
+
+def test_from_terms_matches_any_term():
+    query = SearchQuery.from_terms(['budget', 'invoice'])
+    assert query.evaluate(doc(content='the invoice')) is True
+    assert query.evaluate(doc(content='nothing here')) is False
+    assert query.term_labels == ['budget', 'invoice']
+
+
+def test_not_is_undecided_until_content_is_known():
+    query = SearchQuery('NOT draft')
+    assert query.evaluate(doc()) is None
+    assert query.evaluate(doc(content='final copy')) is True
+    assert query.evaluate(doc(content='a draft copy')) is False
+    # A filename match decides it without content
+    assert query.evaluate(doc(name='draft.txt')) is False
+
+
+def test_metadata_decides_before_extraction():
+    query = SearchQuery('budget ext:pdf size:>1kb')
+    assert query.evaluate(doc(name='budget.txt', size=5000)) is False
+    assert query.evaluate(doc(name='notes.pdf', size=10)) is False
+    assert query.evaluate(doc(name='notes.pdf', size=5000)) is None
+    assert query.evaluate(doc(name='budget.pdf', size=5000)) is True
+
+
+def test_size_and_modified_ranges():
+    assert SearchQuery('size:1k..2k').evaluate(doc(size=1500)) is True
+    assert SearchQuery('size:1k..2k').evaluate(doc(size=4096)) is False
+    old = time.time() - 30 * 86400
+    assert SearchQuery('modified:7d').evaluate(doc(mtime=old)) is False
+    assert SearchQuery('modified:<7d').evaluate(doc(mtime=old)) is True
+    assert SearchQuery('modified:>2000-01-01').evaluate(doc()) is True
+
+
+def test_matched_terms_skip_negated_terms():
+    query = SearchQuery('(budget OR "cost plan") NOT draft')
+    assert query.matched_terms(doc(content='budget and cost plan')) == ['budget', '"cost plan"']
+
+
+@pytest.mark.parametrize('pattern, expected', [
+    ('foo.*bar', ['foo', 'bar']),
+    ('ab?c', ['a', 'c']),
+    ('x|y', []),
+    (r'\d+-invoice', ['-invoice']),
+    (r'foo\.bar', ['foo.bar']),
+    (r'\x41BC', []),
+    (r'\0101', []),
+    (r'(?x) a b', []),
+])
+def test_required_literals(pattern, expected):
+    assert required_literals(pattern) == expected
+
+
+PARITY_PATTERNS = [
+    r'\x41BC', r'\0101', r'\101BC', r'ét', r'\U000000e9t', r'\N{LATIN SMALL LETTER E WITH ACUTE}t',
+    r'(a)\1b', r'(a)(b)(c)(d)(e)(f)(g)(h)(i)(j)\10x', r'\d+-inv', r'foo\.bar', r'\\x41',
+    r'\bword\b', r'a\tb', r'ab?c', r'foo.*bar', 'istanbul', 'stop', 'ſtop', 'kelvin',
+]
+PARITY_TEXTS = [
+    'ABC', 'A', '0101', 'éte', 'ét', 'aab', 'abcdefghijjx', '12-inv', 'foo.bar', '\\x41',
+    'a word b', 'a\tb', 'fooXbar', 'ac', 'abc', 'İstanbul', 'ſtop', 'STOP', 'stop', 'Kelvin',
+]
+
+
+@pytest.mark.parametrize('flags', ['', 'i'])
+@pytest.mark.parametrize('pattern', PARITY_PATTERNS)
+def test_prefilter_agrees_with_regex(pattern, flags):
+    node = RegexNode(pattern, flags)
+    for text in PARITY_TEXTS + [text.upper() for text in PARITY_TEXTS]:
+        expected = node.regex.search(text) is not None
+        assert node._matches(text, text.lower()) == expected, (pattern, flags, text)
+
+
+def test_regex_flags():
+    assert SearchQuery('/INV-\\d+/i').evaluate(doc(content='inv-42')) is True
+    assert SearchQuery('/INV-\\d+/').evaluate(doc(content='inv-42')) is False
+    assert isinstance(RegexNode('a', 'ims').regex, re.Pattern)
@@ -0,0 +1,69 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.services.search_coordinator import SearchCoordinator
+
+
+def result(path, content_hash, content='same extracted text'):
+    return {'path': path, 'name': path.rsplit('/', 1)[-1], 'matches': ['budget'],
+            'full_content': content, 'content_hash': content_hash}
+
+
+@pytest.fixture
+def peer():
+    """Start a stub peer whose /api/search returns the given results"""
+    servers = []
+
+    def start(results):
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers['Content-Length']))
+                body = json.dumps({'success': True, 'results': results, 'stats': {
+                    'total_files_scanned': len(results), 'search_terms': ['budget']
+                }}).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f'http://127.0.0.1:{server.server_port}'
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def test_dedupes_on_file_hash_not_extracted_text(peer):
+    first = peer([result('/a/report.pdf', 'hash-1'), result('/a/other.pdf', 'hash-2')])
+    second = peer([result('/b/report-copy.pdf', 'hash-1'), result('/b/unhashed.pdf', None)])
+    coordinator = SearchCoordinator([first, second], timeout=5)
+
+    merged = coordinator.search({'paths': ['/'], 'terms': ['budget']})
+
+    # Same extracted text everywhere, but only the identical file is merged
+    paths = sorted(item['path'] for item in merged['results'])
+    assert len(paths) == 3
+    assert '/b/unhashed.pdf' in paths
+    assert merged['stats']['duplicates_removed'] == 1
+    assert merged['stats']['total_files_scanned'] == 4
+    assert merged['success'] and not merged['partial']
+
+
+def test_unreachable_peer_gives_partial_result(peer):
+    live = peer([result('/a/report.pdf', 'hash-1')])
+    coordinator = SearchCoordinator([live, 'http://127.0.0.1:9'], timeout=2)
+
+    merged = coordinator.search({'paths': ['/'], 'terms': ['budget']})
+
+    assert merged['partial'] and merged['stats']['shards_failed'] == 1
+    assert [item['path'] for item in merged['results']] == ['/a/report.pdf']